@@ -1,7 +1,8 @@
 #!/bin/bash
 
 # Define the qiime channel version from the tag
-channel_version=$(echo "$2" | cut -d'.' -f1-2)
+IFS=. read -r epoch_year epoch_month _ <<< "$2"
+channel_version="$epoch_year${epoch_month:+.$epoch_month}"
 
 # Define the paths to meta.yaml, env output file, and YAML repo file
 template_file="ci/recipe/meta.yaml"
@@ -13,38 +14,63 @@ repo_urls_file="repo-urls.txt"
 inside_run_section=false
 dependencies=""
 qiime_dependencies=""
+has_q2cli=false
 repo_urls=""
 
+# Patterns used while scanning meta.yaml, defined once outside the loop
+run_section_re='^[[:space:]]*run:'
+dependency_re='^[[:space:]]*-[[:space:]]*(.*)$'
+qiime_dep_re='^(q2|qiime2)'
+has_alnum_re='[[:alnum:]]'
+template_re=' \{\{ (qiime2_epoch|bowtie2) \}\}'
+
 while IFS= read -r line; do
     # If we encounter the "run:" line, set flag to true
-    if [[ $line =~ ^[[:space:]]*run: ]]; then
+    if [[ $line =~ $run_section_re ]]; then
         inside_run_section=true
         continue
     fi
 
     # If we're inside the "run:" section add line to dependencies
     if [[ $inside_run_section == true ]]; then
-        # Replace the pattern " {{ qiime2_epoch }}.*" with the version tag
-        line=$(echo "$line" | sed "s/ {{ qiime2_epoch }}.*/==$2*/")
-        # Replace the pattern " {{ bowtie2 }}" with "2.5.1"
-        line=$(echo "$line" | sed "s/ {{ bowtie2 }}/==2.5.1/")
-        dependencies+="$line"$'\n'
+        # Only lines referencing a known template variable need rewriting;
+        # keep going until every template variable on the line is expanded
+        while [[ $line =~ $template_re ]]; do
+            case ${BASH_REMATCH[1]} in
+                # Replace the pattern " {{ qiime2_epoch }}.*" with the version tag
+                qiime2_epoch) line=${line/" {{ qiime2_epoch }}"*/"==$2*"} ;;
+                # Replace the pattern " {{ bowtie2 }}" with "2.5.1"
+                bowtie2) line=${line/" {{ bowtie2 }}"/"==2.5.1"} ;;
+            esac
+        done
+        # Strip the list marker once and reuse the bare dependency below
+        if [[ $line =~ $dependency_re ]]; then
+            dependency=${BASH_REMATCH[1]}
+            dependencies+="    - $dependency"$'\n'
 
-        # Check if the line contains qiime2 or q2 and add to qiime_dependencies
-        if [[ $line =~ ^[[:space:]]*-[[:space:]]*(q2|qiime2) ]]; then
-            package_name=$(echo "$line" | sed -E 's/^[[:space:]]*-[[:space:]]*([^=<>]+).*$/\1/')
-            qiime_dependencies+="$package_name"$'\n'
+            # Check if the dependency is qiime2 or q2 and add to qiime_dependencies
+            if [[ $dependency =~ $qiime_dep_re ]]; then
+                package_name=${dependency%%[=<>[:space:]]*}
+                qiime_dependencies+="$package_name"$'\n'
+                if [[ $package_name == q2cli ]]; then
+                    has_q2cli=true
+                fi
+            fi
+        else
+            dependencies+="$line"$'\n'
         fi
     fi
 
     # If we encounter an empty line and we're inside the run: section, exit
-    if [[ $inside_run_section == true && ! $line =~ [[:alnum:]] ]]; then
+    if [[ $inside_run_section == true && ! $line =~ $has_alnum_re ]]; then
         break
     fi
 done < "$template_file"
 
-# Add qcli to qiime_dependencies
-qiime_dependencies+="q2cli"
+# Add q2cli to qiime_dependencies unless the recipe already lists it
+if [[ $has_q2cli == false ]]; then
+    qiime_dependencies+="q2cli"
+fi
 
 # Write the dependencies to the output YAML file
 cat <<EOF > "$output_file"
@@ -60,15 +86,26 @@ dependencies:
 $dependencies
 EOF
 
-# Read the repo YAML file and extract URLs based on the qiime_dependencies
+# Read the repo YAML file once into a newline-delimited "name url" table
+# (one record per line, so both python-yq and Go yq produce the same
+# output; a plain string keeps this working on bash 3.2)
+repo_url_table=$'\n'
+while read -r name url; do
+    if [[ -n "$name" && -n "$url" && "$url" != "null" ]]; then
+        repo_url_table+="$name $url"$'\n'
+    fi
+done < <(yq '.repositories[] | .name + " " + .url' "$repo_yaml_file" | tr -d '"')
+
+# Extract URLs based on the qiime_dependencies
 while IFS= read -r package_name; do
     if [[ -n "$package_name" ]]; then
-        url=$(yq ".repositories[] | select(.name == \"$package_name\") | .url" "$repo_yaml_file" | tr -d '"')
-        if [[ -n "$url" ]]; then
-            repo_urls+="git+$url.git"$'\n'
+        entry=$'\n'"$package_name "
+        if [[ $repo_url_table == *"$entry"* ]]; then
+            url=${repo_url_table#*"$entry"}
+            repo_urls+="git+${url%%$'\n'*}.git"$'\n'
         fi
     fi
 done <<< "$qiime_dependencies"
 
 # Write the repo URLs to the repo-urls.txt file
-echo "$repo_urls" > "$repo_urls_file"
+printf '%s' "$repo_urls" > "$repo_urls_file"
@@ -1,21 +1,53 @@
 import requests
 import os
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for every API request
+REQUEST_TIMEOUT = (3.05, 15)
+
+
+def create_session():
+    retry = Retry(
+        total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]
+    )
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(max_retries=retry))
+    return session
+
+
+SESSION = create_session()
+
 
 def get_latest_tags(repo):
-    url = f'https://api.github.com/repos/{repo}/tags'
-    response = requests.get(url)
+    url = f'https://api.github.com/repos/{repo}/tags?per_page=10'
+
+    # Authenticated requests get 5000 req/hr instead of 60
+    headers = {}
+    token = os.getenv('GITHUB_TOKEN')
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+
+    response = SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
     tags = response.json()
     return [tag['name'] for tag in tags]
 
 
 def get_latest_dev_and_stable(tags):
-    dev_tags = [tag for tag in tags if 'dev0' in tag]
-    stable_tags = [tag for tag in tags if 'dev0' not in tag]
+    latest_dev_tag = None
+    latest_stable_tag = None
+
+    for tag in tags:
+        if 'dev0' in tag:
+            if latest_dev_tag is None:
+                latest_dev_tag = tag
+        elif latest_stable_tag is None:
+            latest_stable_tag = tag
 
-    latest_dev_tag = dev_tags[0] if dev_tags else None
-    latest_stable_tag = stable_tags[0] if stable_tags else None
+        if latest_dev_tag and latest_stable_tag:
+            break
 
     return latest_dev_tag, latest_stable_tag
 